@@ -1,6 +1,41 @@
 import random
+import sys
 from typing import Optional
 
+# Offsets of the eight cells surrounding a given cell, built once at import
+# time so neighbour lookups don't rebuild the table on every call.
+_OFFSETS = tuple((dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if (dx, dy) != (0, 0))
+
+
+def _infer(candidates, mines_mask, safes_mask):
+    """
+    Runs the pairwise subset-inference pass over (size, cells, count) rows
+    sorted by size, simplifying each inferred sentence against the cells
+    already known to be mines or safe. Returns (cells, count) pairs.
+    """
+    inferred = []
+    known_mask = mines_mask | safes_mask
+    for i, (size, cells, count) in enumerate(candidates):
+        for other_size, other_cells, other_count in candidates[i + 1:]:
+            if size == other_size:
+                continue
+            if cells & other_cells == cells:
+                new_cells = other_cells & ~cells
+                new_count = other_count - count - (new_cells & mines_mask).bit_count()
+                inferred.append((new_cells & ~known_mask, new_count))
+    return inferred
+
+
+def _mask_to_cells(mask, width):
+    """
+    Yields the (i, j) cells encoded in a bitmask,
+    where cell (i, j) is encoded as bit i * width + j.
+    """
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        yield divmod(bit.bit_length() - 1, width)
+
 
 class Minesweeper():
     """
@@ -15,20 +50,23 @@ class Minesweeper():
         self.mines = set()
 
         # Initialize an empty field with no mines
-        self.board = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                row.append(False)
-            self.board.append(row)
-
-        # Add mines randomly
-        while len(self.mines) != mines:
-            i = random.randrange(height)
-            j = random.randrange(width)
-            if not self.board[i][j]:
-                self.mines.add((i, j))
-                self.board[i][j] = True
+        self.board = [[False] * width for _ in range(height)]
+
+        # Add mines randomly, drawing all positions at once without
+        # replacement rather than rejection-sampling one at a time
+        for index in random.sample(range(height * width), mines):
+            i, j = divmod(index, width)
+            self.mines.add((i, j))
+            self.board[i][j] = True
+
+        # Precompute the nearby-mine count for every cell by spreading
+        # each mine onto its in-bounds neighbours, so nearby_mines is a
+        # plain grid lookup instead of a 3x3 scan per call
+        self._counts = [[0] * width for _ in range(height)]
+        for i, j in self.mines:
+            for dx, dy in _OFFSETS:
+                if 0 <= i + dx < height and 0 <= j + dy < width:
+                    self._counts[i + dx][j + dy] += 1
 
         # At first, player has found no mines
         self.mines_found = set()
@@ -38,15 +76,15 @@ class Minesweeper():
         Prints a text-based representation
         of where mines are located.
         """
-        for i in range(self.height):
-            print("--" * self.width + "-")
-            for j in range(self.width):
-                if self.board[i][j]:
-                    print("|X", end="")
-                else:
-                    print("| ", end="")
-            print("|")
-        print("--" * self.width + "-")
+        # Assemble the whole board into one string and write it in a
+        # single call rather than one print per cell
+        separator = "--" * self.width + "-\n"
+        lines = [separator]
+        for row in self.board:
+            lines.append("".join("|X" if cell else "| " for cell in row))
+            lines.append("|\n")
+            lines.append(separator)
+        sys.stdout.write("".join(lines))
 
     def is_mine(self, cell):
         i, j = cell
@@ -58,24 +96,7 @@ class Minesweeper():
         within one row and column of a given cell,
         not including the cell itself.
         """
-
-        # Keep count of nearby mines
-        count = 0
-
-        # Loop over all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
-
-                # Update count if cell in bounds and is mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
-
-        return count
+        return self._counts[cell[0]][cell[1]]
 
     def won(self):
         """
@@ -87,7 +108,8 @@ class Minesweeper():
 class Sentence():
     """
     Logical statement about a Minesweeper game
-    A sentence consists of a set of board cells,
+    A sentence consists of a set of board cells encoded as an int bitmask
+    (cell (i, j) is bit i * width + j),
     and a count of the number of those cells which are mines.
     """
 
@@ -95,59 +117,84 @@ class Sentence():
     # so that either the count of mines == the number of cells, and they're all mines,
     # or the count of mines == 0, and they're all safe.
 
+    # Resolution states, cached on the sentence so known_mines/known_safes
+    # are a single int compare instead of a popcount per call
+    UNRESOLVED = 0
+    ALL_MINES = 1
+    ALL_SAFE = 2
+
     def __init__(self, cells, count):
-        self.cells = set(cells)
+        self.cells = cells
         self.count = count
+        self._refresh_state()
 
     def __eq__(self, other):
         return self.cells == other.cells and self.count == other.count
 
     def __str__(self):
-        return f"{self.cells} = {self.count}"
+        return f"{self.cells:#x} = {self.count}"
 
-    def known_mines(self):
+    def _refresh_state(self):
         """
-        Returns the set of all cells in self.cells known to be mines.
+        Recomputes the cached resolution state after cells/count change.
         """
-        # If the number of cells in the sentence is equal to the count,
-        # then all cells in the sentence must be mines.
-        if len(self.cells) == self.count and self.count > 0:
-            return self.cells
-        # Otherwise, we cannot infer that any cells are mines.
+        # If the count is 0 the remaining cells are all safe; if it equals
+        # the number of cells they are all mines; otherwise undetermined.
+        if self.count == 0:
+            self._state = Sentence.ALL_SAFE
+        elif self.cells.bit_count() == self.count:
+            self._state = Sentence.ALL_MINES
         else:
-            return set()
+            self._state = Sentence.UNRESOLVED
+
+    def known_mines(self):
+        """
+        Returns the bitmask of all cells in self.cells known to be mines.
+        """
+        return self.cells if self._state == Sentence.ALL_MINES else 0
 
     def known_safes(self):
         """
-        Returns the set of all cells in self.cells known to be safe.
+        Returns the bitmask of all cells in self.cells known to be safe.
         """
-        # If the count is 0, then all cells in the sentence must be safe.
-        if self.count == 0:
-            return self.cells
-        # Otherwise, we cannot infer that any cells are safe.
-        else:
-            return set()
+        return self.cells if self._state == Sentence.ALL_SAFE else 0
 
-    def mark_mine(self, cell):
+    def mark_mine(self, bit):
         """
         Updates internal knowledge representation given the fact that
-        a cell is known to be a mine.
+        the cell at the given bit is known to be a mine.
         """
         # If the cell is in the sentence, remove it,
         # and remove a mine from the count.
-        if cell in self.cells:
-            self.cells.remove(cell)
+        if self.cells & bit:
+            self.cells ^= bit
             self.count -= 1
+            self._refresh_state()
 
-    def mark_safe(self, cell):
+    def mark_safe(self, bit):
         """
         Updates internal knowledge representation given the fact that
-        a cell is known to be safe.
+        the cell at the given bit is known to be safe.
         """
         # If the cell is in the sentence, remove it,
         # but leave the count unchanged.
-        if cell in self.cells:
-            self.cells.remove(cell)
+        if self.cells & bit:
+            self.cells ^= bit
+            self._refresh_state()
+
+    def mark_cells(self, mines_mask, safes_mask):
+        """
+        Updates internal knowledge representation given bitmasks of cells
+        known to be mines and cells known to be safe, in one pass.
+        """
+        # Remove all the marked cells from the sentence, and remove a mine
+        # from the count for each known mine that was present.
+        hit_mines = self.cells & mines_mask
+        if hit_mines:
+            self.count -= hit_mines.bit_count()
+        if self.cells & (mines_mask | safes_mask):
+            self.cells &= ~(mines_mask | safes_mask)
+            self._refresh_state()
 
 
 class MinesweeperAI():
@@ -164,77 +211,138 @@ class MinesweeperAI():
         # Keep track of which cells have been clicked on
         self.moves_made = set()
 
-        # Keep track of cells known to be safe or mines
+        # Every cell on the board, plus an incrementally maintained set of
+        # cells still available to play (not a known mine, not yet chosen)
+        self._all_cells = frozenset((i, j) for i in range(height) for j in range(width))
+        self._available = set(self._all_cells)
+
+        # Keep track of cells known to be safe or mines, both as sets of
+        # (i, j) tuples and as bitmasks mirroring the Sentence encoding
         self.mines = set()
         self.safes = set()
+        self._mines_mask = 0
+        self._safes_mask = 0
 
-        # List of sentences about the game known to be true
+        # List of sentences about the game known to be true, with a parallel
+        # set of (cells, count) keys so duplicate checks are O(1) instead of
+        # an equality scan over the whole list. Keys can go stale when
+        # sentences are mutated in place, so this is a dedup hint only.
         self.knowledge = []
+        self._known_keys: set[tuple[int, int]] = set()
+
+        # Precomputed table of valid neighbours for every cell; for a fixed
+        # board the neighbour set of a cell never changes. Kept both as
+        # tuples of cells and as bitmasks for building sentences. Interior
+        # cells always have all eight neighbours in bounds, so only the
+        # border cells need the bounds filter.
+        self._nbrs = []
+        for i in range(height):
+            row = []
+            for j in range(width):
+                if 1 <= i < height - 1 and 1 <= j < width - 1:
+                    row.append(tuple((i + dx, j + dy) for dx, dy in _OFFSETS))
+                else:
+                    row.append(tuple((i + dx, j + dy) for dx, dy in _OFFSETS
+                                     if 0 <= i + dx < height and 0 <= j + dy < width))
+            self._nbrs.append(row)
+        self._nbr_masks = [[sum(1 << (x * width + y) for x, y in self._nbrs[i][j])
+                            for j in range(width)]
+                           for i in range(height)]
+
+    def cell_bit(self, cell) -> int:
+        """
+        Returns the single-bit mask encoding a given cell.
+        """
+        return 1 << (cell[0] * self.width + cell[1])
 
     def mark_mine(self, cell):
         """
         Marks a cell as a mine, and updates all knowledge
         to mark that cell as a mine as well.
         """
-        self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        self._batch_mark(self.cell_bit(cell), 0)
 
     def mark_safe(self, cell):
         """
         Marks a cell as safe, and updates all knowledge
         to mark that cell as safe as well.
         """
-        self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+        self._batch_mark(0, self.cell_bit(cell))
 
-    def update_known_cells(self):
+    def _batch_mark(self, mines_mask, safes_mask):
         """
-        Using the knowledge base, update any cells which are known to be safe or mines.
+        Marks every cell in the given bitmasks as a mine or as safe,
+        broadcasting the whole batch over the knowledge base in one pass.
         """
+        mines_mask &= ~self._mines_mask
+        safes_mask &= ~self._safes_mask
+        if not (mines_mask or safes_mask):
+            return
+
+        width = self.width
+        self._mines_mask |= mines_mask
+        self._safes_mask |= safes_mask
+        if mines_mask:
+            new_mines = set(_mask_to_cells(mines_mask, width))
+            self.mines |= new_mines
+            self._available -= new_mines
+        if safes_mask:
+            self.safes.update(_mask_to_cells(safes_mask, width))
+
         for sentence in self.knowledge:
-            for cell in sentence.known_mines().copy():
-                self.mark_mine(cell)
-            for cell in sentence.known_safes().copy():
-                self.mark_safe(cell)
+            sentence.mark_cells(mines_mask, safes_mask)
 
-    def create_simplest_sentence(self, sentence, other_sentence) -> Sentence:
+    def update_known_cells(self):
         """
-        Creates the simplest sentence inferred from two sentences
-        by removing the cells that are known to be safe or mines.
+        Using the knowledge base, update any cells which are known to be safe or mines.
         """
+        # Collect everything the sentences resolve in one sweep, broadcast
+        # the batch, and repeat until no new cells are learned: a batch of
+        # marks can resolve further sentences.
+        while True:
+            mines_mask = 0
+            safes_mask = 0
+            for sentence in self.knowledge:
+                mines_mask |= sentence.known_mines()
+                safes_mask |= sentence.known_safes()
+            mines_mask &= ~self._mines_mask
+            safes_mask &= ~self._safes_mask
+            if not (mines_mask or safes_mask):
+                break
+            self._batch_mark(mines_mask, safes_mask)
 
-        cells_subset = set(other_sentence.cells) - set(sentence.cells)
-        count_of_subset = other_sentence.count - sentence.count
-
-        subset, count = self.create_simplest_cell_subset(cells_subset, count_of_subset)
-        return Sentence(subset, count)
+        # Marking empties out resolved sentences; drop them so they stop
+        # being iterated by mark_mine/mark_safe and the inference scan,
+        # and refresh the dedup keys to match the surviving sentences.
+        self.knowledge = [s for s in self.knowledge if s.cells]
+        self._known_keys = {(s.cells, s.count) for s in self.knowledge}
 
-    def create_simplest_cell_subset(self, cells, count) -> \
-            tuple[set[tuple[int, int]], int]:
+    def create_simplest_cell_subset(self, cells_mask, count) -> tuple[int, int]:
         """
-        Creates the simplest cell subset inferred from a set of cells
+        Creates the simplest cell subset inferred from a bitmask of cells
         """
 
-        cells_to_assign = set(n for n in cells if not (n in self.mines or n in self.safes))
-        count_of_subset = count - len([n for n in cells if n in self.mines])
+        cells_to_assign = cells_mask & ~self._mines_mask & ~self._safes_mask
+        count_of_subset = count - (cells_mask & self._mines_mask).bit_count()
 
         return cells_to_assign, count_of_subset
 
-    def get_neighbour_cells(self, cell) -> list[tuple[int, int]]:
+    def add_sentence(self, sentence) -> None:
         """
-        Returns the list of neighbour cells of a given cell,
-        constrained by the specified grid dimensions.
+        Appends a sentence to the knowledge base,
+        unless an equal sentence is already present.
         """
-        x_index, y_index = cell
-        neighbour_cells = [(x_index - 1, y_index - 1), (x_index - 1, y_index), (x_index - 1, y_index + 1),
-                           (x_index, y_index - 1), (x_index, y_index + 1),
-                           (x_index + 1, y_index - 1), (x_index + 1, y_index), (x_index + 1, y_index + 1)]
-        # remove cells that are not on the board
-        valid_neighbour_cells = [n for n in neighbour_cells if 0 <= n[0] < self.height and 0 <= n[1] < self.width]
+        key = (sentence.cells, sentence.count)
+        if key not in self._known_keys:
+            self._known_keys.add(key)
+            self.knowledge.append(sentence)
 
-        return valid_neighbour_cells
+    def get_neighbour_cells(self, cell) -> tuple[tuple[int, int], ...]:
+        """
+        Returns the neighbour cells of a given cell,
+        constrained by the specified grid dimensions.
+        """
+        return self._nbrs[cell[0]][cell[1]]
 
     def add_knowledge(self, cell, count):
         """
@@ -243,25 +351,37 @@ class MinesweeperAI():
         """
 
         self.moves_made.add(cell)
+        self._available.discard(cell)
         self.mark_safe(cell)
 
-        neighbour_cells = self.get_neighbour_cells(cell)
-        subset_neighbour_cells, subset_count = self.create_simplest_cell_subset(neighbour_cells, count)
-        new_sentence = Sentence(subset_neighbour_cells, subset_count)
-        self.knowledge.append(new_sentence)
+        neighbour_mask = self._nbr_masks[cell[0]][cell[1]]
+        subset_neighbour_cells, subset_count = self.create_simplest_cell_subset(neighbour_mask, count)
+        # A sentence that is already resolved (no mines, or nothing but
+        # mines) never needs to enter the knowledge base: broadcast its
+        # cells directly and spare the inference scan an extra sentence.
+        if subset_count == 0:
+            self._batch_mark(0, subset_neighbour_cells)
+        elif subset_count == subset_neighbour_cells.bit_count():
+            self._batch_mark(subset_neighbour_cells, 0)
+        else:
+            self.add_sentence(Sentence(subset_neighbour_cells, subset_count))
         self.update_known_cells()
 
         # add any new sentences to the AI’s knowledge base
         # if they can be inferred from existing knowledge.
-        pre_existing_knowledge = self.knowledge.copy()
-        for sentence in pre_existing_knowledge:
-            for other_sentence in pre_existing_knowledge:
-                if sentence != other_sentence and \
-                        sentence.cells.issubset(other_sentence.cells):
-
-                    new_sentence = self.create_simplest_sentence(sentence, other_sentence)
-                    if new_sentence not in self.knowledge:
-                        self.knowledge.append(new_sentence)
+        # Empty or already-resolved sentences (all mines or all safe) have
+        # been consumed by update_known_cells, so any inference drawn from
+        # them is redundant — leave them out of the scan.
+        # Sorting by sentence size means a sentence only needs to be tested
+        # against the strictly larger ones that follow it: a set can never be
+        # a proper subset of one the same size or smaller. The scan runs over
+        # parallel (size, cells, count) rows extracted up front, so the inner
+        # loop works on plain ints with no attribute lookups.
+        candidates = sorted((s.cells.bit_count(), s.cells, s.count)
+                            for s in self.knowledge
+                            if s.cells and 0 < s.count < s.cells.bit_count())
+        for new_cells, new_count in _infer(candidates, self._mines_mask, self._safes_mask):
+            self.add_sentence(Sentence(new_cells, new_count))
         self.update_known_cells()
 
     def make_safe_move(self) -> Optional[tuple[int, int]]:
@@ -273,13 +393,7 @@ class MinesweeperAI():
         This function may use the knowledge in self.mines, self.safes
         and self.moves_made, but should not modify any of those values.
         """
-
-        for i in range(self.height):
-            for j in range(self.width):
-                if (i, j) in self.safes and (i, j) not in self.moves_made:
-                    return (i, j)
-
-        return None
+        return next(iter(self.safes - self.moves_made), None)
 
     def make_random_move(self) -> Optional[tuple[int, int]]:
         """
@@ -288,11 +402,12 @@ class MinesweeperAI():
             1) have not already been chosen, and
             2) are not known to be mines
         """
-        possible_cells: list[tuple[int, int]] = []
-        for i in range(self.height):
-            for j in range(self.width):
-                if (i, j) not in self.mines and (i, j) not in self.moves_made:
-                    possible_cells.append((i, j))
-        if possible_cells:
-            return random.choice(possible_cells)
-        return None
+        # Reservoir sampling: one pass over the available set, uniform
+        # choice, and no intermediate sequence to allocate
+        chosen = None
+        seen = 0
+        for cell in self._available:
+            seen += 1
+            if random.randrange(seen) == 0:
+                chosen = cell
+        return chosen